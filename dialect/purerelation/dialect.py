@@ -1,5 +1,6 @@
 from abc import ABC
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Set, List
 
 from model.metamodel import ExecutionVisitor, JoinClause, LimitClause, DistinctClause, GroupByClause, ExtendClause, \
@@ -12,36 +13,93 @@ from model.metamodel import ExecutionVisitor, JoinClause, LimitClause, DistinctC
     MultiplyBinaryOperator, SubtractBinaryOperator, DivideBinaryOperator, OffsetClause, RenameClause, \
     OrderByExpression, IfExpression, ColumnReferenceExpression, DateLiteral, GroupByExpression, \
     ComputedColumnAliasExpression, VariableAliasExpression, MapReduceExpression, LambdaExpression, AverageFunction, \
-    AscendingOrderType, DescendingOrderType, OrderByClause, ModuloFunction, ExponentFunction
-
+    AscendingOrderType, DescendingOrderType, OrderByClause, ModuloFunction, ExponentFunction, Expression
+
+# symbols for the marker operators, looked up by exact type to skip a visitor call per operator;
+# any other operator type (e.g. a subclass) falls back to its visit method
+_UNARY_OPERATORS = {
+    NotUnaryOperator: "!",
+}
+
+_BINARY_OPERATORS = {
+    EqualsBinaryOperator: "==",
+    NotEqualsBinaryOperator: "!=",
+    GreaterThanBinaryOperator: ">",
+    GreaterThanEqualsBinaryOperator: ">=",
+    LessThanBinaryOperator: "<",
+    LessThanEqualsBinaryOperator: "<=",
+    AndBinaryOperator: "and",
+    OrBinaryOperator: "or",
+    AddBinaryOperator: "+",
+    MultiplyBinaryOperator: "*",
+    SubtractBinaryOperator: "-",
+    DivideBinaryOperator: "/",
+}
+
+# fast paths for join kinds and sort directions; other types fall back to their visit methods
+_JOIN_KINDS = {
+    InnerJoinType: "JoinKind.INNER",
+    LeftJoinType: "JoinKind.LEFT",
+}
+
+_ORDER_DIRECTIONS = {
+    AscendingOrderType: "ascending",
+    DescendingOrderType: "descending",
+}
+
+# backslashes and quotes are escaped in one pass so string literals stay well formed
+_STRING_ESCAPES = str.maketrans({"\\": "\\\\", "'": "\\'"})
+
+@lru_cache(maxsize=1024)
+def _relation_accessor(database: str, table: str) -> str:
+    return "".join(("#>{", database, ".", table, "}#"))
 
 @dataclass
 class PureRuntime(Runtime, ABC):
     name: str
 
     def executable_to_string(self, clauses: List[Clause]) -> str:
-        visitor = PureRelationExpressionVisitor(self)
-        return "->".join(map(lambda clause: clause.visit(visitor, ""), clauses)) + self.visit(visitor, "")
+        visitor = _VISITOR
+        return "->".join(visitor._visit_all(clauses)) + self.visit(visitor, "")
 
 class NonExecutablePureRuntime(PureRuntime):
     def eval(self, clauses: List[Clause]) -> str:
         raise NotImplementedError()
 
-@dataclass
 class PureRelationExpressionVisitor(ExecutionVisitor):
-    runtime: PureRuntime
+    __slots__ = ()
+
+    def _visit_all(self, nodes: List) -> List[str]:
+        # one dict lookup and one call per node, instead of node.visit bouncing back into the visitor
+        dispatch = _DISPATCH.get
+        return [handler(self, node, "") if (handler := dispatch(type(node))) is not None else node.visit(self, "") for node in nodes]
+
+    def _operand(self, val: Expression) -> str:
+        # operands are nearly always OperandExpression wrappers, so step through the wrapper without a visit
+        if type(val) is OperandExpression:
+            val = val.expression
+        # column and integer leaves dominate comparisons, so render them here rather than through their visit methods
+        if type(val) is ColumnAliasExpression and type(val.reference) is ColumnReferenceExpression:
+            return f"${val.alias}.{val.reference.name}"
+        if type(val) is LiteralExpression and type(val.literal) is IntegerLiteral:
+            return str(val.literal.value())
+        handler = _DISPATCH.get(type(val))
+        return handler(self, val, "") if handler is not None else val.visit(self, "")
+
+    def _join(self, expressions: List) -> str:
+        return ", ".join(self._visit_all(expressions))
 
     def visit_runtime(self, val: PureRuntime, parameter: str) -> str:
-        return "->from(" + val.name + ")"
+        return f"->from({val.name})"
 
     def visit_from_clause(self, val: FromClause, parameter: str) -> str:
-        return  "#>{" + val.database + "." + val.table + "}#"
+        return _relation_accessor(val.database, val.table)
 
     def visit_integer_literal(self, val: IntegerLiteral, parameter: str) -> str:
         return str(val.value())
 
     def visit_string_literal(self, val: StringLiteral, parameter: str) -> str:
-        return "'" + val.value() + "'"
+        return "'" + val.value().translate(_STRING_ESCAPES) + "'"
 
     def visit_boolean_literal(self, val: BooleanLiteral, parameter: str) -> str:
         return str(val.value())
@@ -50,10 +108,12 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return val.expression.visit(self, "")
     
     def visit_unary_expression(self, val: UnaryExpression, parameter: str) -> str:
-        return val.operator.visit(self, "") + val.expression.visit(self, "")
+        operator = _UNARY_OPERATORS.get(type(val.operator)) or val.operator.visit(self, "")
+        return operator + self._operand(val.expression)
 
     def visit_binary_expression(self, val: BinaryExpression, parameter: str) -> str:
-        return val.left.visit(self, "") + val.operator.visit(self, "") + val.right.visit(self, "")
+        operator = _BINARY_OPERATORS.get(type(val.operator)) or val.operator.visit(self, "")
+        return self._operand(val.left) + operator + self._operand(val.right)
     
     def visit_not_unary_operator(self, val: NotUnaryOperator, parameter: str) -> str:
         return "!"
@@ -104,13 +164,22 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return val.alias + ":" + val.expression.visit(self, "")
 
     def visit_column_alias_expression(self, val: ColumnAliasExpression, parameter: str) -> str:
-        return "$" + val.alias + "." + val.reference.visit(self, "")
+        reference = val.reference
+        name = reference.name if type(reference) is ColumnReferenceExpression else reference.visit(self, "")
+        return f"${val.alias}.{name}"
 
     def visit_function_expression(self, val: FunctionExpression, parameter: str) -> str:
         #TODO: AJH: this probably isn't right
-        parameters = list(map(lambda expr: expr.visit(self, ""), val.parameters))
-        function_string = val.function.visit(self, ",".join(parameters[1:]))
-        return parameters[0] + function_string
+        # unary (count, avg) and binary (mod, pow) calls cover nearly every function, so skip the list for those
+        parameters = val.parameters
+        if len(parameters) == 1:
+            head, arguments = self._operand(parameters[0]), ""
+        elif len(parameters) == 2:
+            head, arguments = self._operand(parameters[0]), self._operand(parameters[1])
+        else:
+            rendered = self._visit_all(parameters)
+            head, arguments = rendered[0], ",".join(rendered[1:])
+        return head + val.function.visit(self, arguments)
 
     def visit_map_reduce_expression(self, val: MapReduceExpression, parameter: str) -> str:
         return val.map_expression.visit(self, "") + " : " + val.reduce_expression.visit(self, "")
@@ -134,25 +203,25 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return "filter(" + val.expression.visit(self, "") + ")"
 
     def visit_selection_clause(self, val: SelectionClause, parameter: str) -> str:
-        return "select(~[" + ", ".join(map(lambda expr: expr.visit(self, ""), val.expressions)) + "])"
+        return "select(~[" + self._join(val.expressions) + "])"
 
     def visit_extend_clause(self, val: ExtendClause, parameter: str) -> str:
-        return "extend(~[" + ", ".join(map(lambda expr: expr.visit(self, ""), val.expressions)) + "])"
+        return "extend(~[" + self._join(val.expressions) + "])"
 
     def visit_group_by_clause(self, val: GroupByClause, parameter: str) -> str:
         return "groupBy(" + val.expression.visit(self, "") + ")"
 
     def visit_group_by_expression(self, val: GroupByExpression, parameter: str) -> str:
-        selections = "~[" + ", ".join(map(lambda selection: selection.visit(self, ""), val.selections)) + "]"
-        expressions = "~[" + ", ".join(map(lambda expression: expression.visit(self, ""), val.expressions)) + "]"
+        selections = "~[" + self._join(val.selections) + "]"
+        expressions = "~[" + self._join(val.expressions) + "]"
         having = ", " + val.having.visit(self, "") if val.having else ""
-        return selections + ", " + expressions + having
+        return f"{selections}, {expressions}{having}"
 
     def visit_distinct_clause(self, val: DistinctClause, parameter: str) -> str:
-        return "distinct(~[" + ", ".join(map(lambda expr: expr.visit(self, ""), val.expressions)) + "])"
+        return "distinct(~[" + self._join(val.expressions) + "])"
 
     def visit_order_by_clause(self, val: OrderByClause, parameter: str) -> str:
-        return "sort([" + ", ".join(map(lambda expr: expr.visit(self, ""), val.ordering)) + "])"
+        return "sort([" + self._join(val.ordering) + "])"
 
     def visit_limit_clause(self, val: LimitClause, parameter: str) -> str:
         return "limit(" + val.value.visit(self, "") + ")"
@@ -161,7 +230,8 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return "{" + val.on.visit(self, "") + "}"
 
     def visit_join_clause(self, val: JoinClause, parameter: str) -> str:
-        return "join(" + val.from_clause.visit(self, "")  + ", " + val.join_type.visit(self, "") + ", " + val.on_clause.visit(self, "") + ")"
+        join_kind = _JOIN_KINDS.get(type(val.join_type)) or val.join_type.visit(self, "")
+        return f"join({val.from_clause.visit(self, "")}, {join_kind}, {val.on_clause.visit(self, "")})"
 
     def visit_inner_join_type(self, val: InnerJoinType, parameter: str) -> str:
         return "JoinKind.INNER"
@@ -179,7 +249,8 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return f"if({val.test.visit(self, parameter)}, | {val.body.visit(self, parameter)}, | {val.orelse.visit(self, parameter)})"
 
     def visit_order_by_expression(self, val: OrderByExpression, parameter: str) -> str:
-        return f"~{val.expression.visit(self, parameter)}->{val.direction.visit(self, parameter)}()"
+        direction = _ORDER_DIRECTIONS.get(type(val.direction)) or val.direction.visit(self, parameter)
+        return f"~{val.expression.visit(self, parameter)}->{direction}()"
 
     def visit_ascending_order_type(self, val: AscendingOrderType, parameter: str) -> str:
         return "ascending"
@@ -188,10 +259,7 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         return "descending"
 
     def visit_rename_clause(self, val: RenameClause, parameter: str) -> str:
-        renames = []
-        for columnAlias in val.columnAliases:
-            renames.append(f"rename(~{columnAlias.reference.visit(self, parameter)}, ~{columnAlias.alias})")
-        return "->".join(renames)
+        return "->".join([f"rename(~{columnAlias.reference.visit(self, parameter)}, ~{columnAlias.alias})" for columnAlias in val.columnAliases])
 
     def visit_offset_clause(self, val: OffsetClause, parameter: str) -> str:
         return f"drop({val.value.visit(self, parameter)})"
@@ -212,4 +280,32 @@ class PureRelationExpressionVisitor(ExecutionVisitor):
         raise NotImplementedError()
 
     def visit_bitwise_or_binary_operator(self, self1, parameter: str) -> str:
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+# exact node type -> visitor method for the nodes that appear in clause and expression lists
+_DISPATCH = {
+    FromClause: PureRelationExpressionVisitor.visit_from_clause,
+    SelectionClause: PureRelationExpressionVisitor.visit_selection_clause,
+    FilterClause: PureRelationExpressionVisitor.visit_filter_clause,
+    ExtendClause: PureRelationExpressionVisitor.visit_extend_clause,
+    GroupByClause: PureRelationExpressionVisitor.visit_group_by_clause,
+    DistinctClause: PureRelationExpressionVisitor.visit_distinct_clause,
+    OrderByClause: PureRelationExpressionVisitor.visit_order_by_clause,
+    LimitClause: PureRelationExpressionVisitor.visit_limit_clause,
+    OffsetClause: PureRelationExpressionVisitor.visit_offset_clause,
+    RenameClause: PureRelationExpressionVisitor.visit_rename_clause,
+    JoinClause: PureRelationExpressionVisitor.visit_join_clause,
+    ColumnReferenceExpression: PureRelationExpressionVisitor.visit_column_reference_expression,
+    ColumnAliasExpression: PureRelationExpressionVisitor.visit_column_alias_expression,
+    ComputedColumnAliasExpression: PureRelationExpressionVisitor.visit_computed_column_alias_expression,
+    VariableAliasExpression: PureRelationExpressionVisitor.visit_variable_alias_expression,
+    OrderByExpression: PureRelationExpressionVisitor.visit_order_by_expression,
+    LiteralExpression: PureRelationExpressionVisitor.visit_literal_expression,
+    OperandExpression: PureRelationExpressionVisitor.visit_operand_expression,
+    BinaryExpression: PureRelationExpressionVisitor.visit_binary_expression,
+    UnaryExpression: PureRelationExpressionVisitor.visit_unary_expression,
+    FunctionExpression: PureRelationExpressionVisitor.visit_function_expression,
+}
+
+# the visitor holds no state, so one instance serves every runtime
+_VISITOR = PureRelationExpressionVisitor()
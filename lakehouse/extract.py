@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from typing import Callable, Dict, Optional, Type, Union
 
@@ -12,6 +13,18 @@ import pyarrow.dataset as ds
 
 from legendql.ql import LegendQL
 
+_connections = threading.local()
+
+
+def _get_connection() -> duckdb.DuckDBPyConnection:
+    # one in-memory connection per thread, so schema inference doesn't pay connect + extension load every call;
+    # the thread-local owns it, so it is released along with its thread
+    con = getattr(_connections, "con", None)
+    if con is None:
+        con = duckdb.connect()
+        _connections.con = con
+    return con
+
 
 @dataclass
 class IngestSource:
@@ -40,10 +53,10 @@ class CSV(FileSource):
 @dataclass
 class Avro(FileSource):
     def auto_infer_columns(self) -> Dict[str, Optional[Type]]:
-        # Use DuckDB to read Avro file and convert to Arrow table
-        con = duckdb.connect()
+        # Use DuckDB to read Avro file and convert to Arrow table; only the schema is needed, so no rows are fetched
+        con = _get_connection()
         relation = con.sql(f"SELECT * FROM read_avro('{self.file_name}')")
-        table = relation.arrow()
+        table = relation.limit(0).arrow()
         return dict(zip(table.schema.names, table.schema.types))
 
 
@@ -58,9 +71,9 @@ class Parquet(FileSource):
 class Json(FileSource):
     def auto_infer_columns(self) -> Dict[str, Optional[Type]]:
         # Read the JSON file using DuckDB instead of direct PyArrow JSON reader
-        con = duckdb.connect()
+        con = _get_connection()
         relation = con.sql(f"SELECT * FROM read_json('{self.file_name}', auto_detect=true)")
-        table = relation.arrow()
+        table = relation.limit(0).arrow()
         return dict(zip(table.schema.names, table.schema.types))
 
 
@@ -70,7 +83,7 @@ class Excel(FileSource):
 
     def auto_infer_columns(self) -> Dict[str, Optional[Type]]:
         # Use DuckDB to read Excel file and convert to Arrow table
-        con = duckdb.connect()
+        con = _get_connection()
 
         # Build the SQL query based on whether sheet_name is provided
         if self.sheet_name:
@@ -79,7 +92,7 @@ class Excel(FileSource):
             query = f"SELECT * FROM read_xlsx('{self.file_name}')"
 
         relation = con.sql(query)
-        table = relation.arrow()
+        table = relation.limit(0).arrow()
         return dict(zip(table.schema.names, table.schema.types))
 
 
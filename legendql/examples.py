@@ -1,7 +1,13 @@
+import sys
+
 import legendql as lq
 from legendql.functions import over, avg, rows, aggregate, unbounded, count, left
 
 
+def _dump(q):
+    # one write per query rather than a print per clause
+    sys.stdout.write("".join(f"{clause}\n" for clause in q._query._clauses))
+
 '''
     Example DSL with Join using Fluent-style API
 '''
@@ -27,8 +33,7 @@ from legendql.functions import over, avg, rows, aggregate, unbounded, count, lef
  .filter(lambda r: r.id > 100)
  .extend(lambda r: (calc_col := r.id + r.sum_salary)))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 
 '''
@@ -52,8 +57,7 @@ q = q.extend(lambda e: (country_code := left(e.country, 2)))
 q = q.order_by(lambda e: [e.sum_gross_cost, -e.country])
 q = q.limit(10)
 
-for clause in q._query._clauses:
-    print(clause)
+_dump(q)
 
 '''
     Same PRQL example using Fluent API, spacing and line breaks are important
@@ -77,8 +81,7 @@ emp = lq.table("db", "employees",
  .order_by(lambda e: [e.sum_gross_cost, -e.country])
  .limit(10))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 
 '''
@@ -97,34 +100,29 @@ emp = lq.table("db", "employees",
         qualify=avg_val > 100_000)))
  )
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 emp = lq.table("db", "employees",
                {"id": int, "name": str, "dept_id": str, "salary": float, "location": str})
 
 emp = emp.extend(lambda r: (avg_val := over(r.location, avg(r.salary))))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 emp = lq.table("db", "employees", {"id": int, "name": str, "title": str, "dept_id": str, "salary": float})
 emp = emp.group_by(lambda r: aggregate(r.title, avg_salary := avg(r.salary)))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 emp = lq.table("db", "employees", {"id": int, "name": str, "title": str, "dept_id": str, "salary": float})
 emp = emp.group_by(lambda r: aggregate([r.title, r.dept_id], avg_salary := avg(r.salary)))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 emp = lq.table("db", "employees", {"id": int, "name": str, "title": str, "dept_id": str, "salary": float})
 emp = emp.group_by(lambda r: aggregate(r.title, avg_salary := avg(r.salary), having=avg_salary > 100_000))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 # emp = lq.from_("db", "employees", {"id": int, "name": str, "dept_id": str, "salary": float, "title": str})
 # dep = lq.from_("db", "department", {"id": int, "name": str, "city": str, "code": str, "location": str})
@@ -140,8 +138,7 @@ emp = (emp
  .left_join(dep, lambda e, d: (e.dept_id == d.id, (new_dept_id := d.id, new_dept_name := d.name)))
  .left_join(loc, lambda d, l: (d.city == l.id, (new_loc_id := l.id, new_loc_name := l.name, new_loc_code := l.code))))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 [emp, dep, loc] = lq.db("db", {
     "employees": {"id": int, "name": str, "dept_id": str, "salary": float},
@@ -153,16 +150,14 @@ emp = (emp
  .left_join(dep, lambda e, d: (e.dept_id == d.id, [(new_dept_id := d.id), (new_dept_name := d.name)]))
  .left_join(loc, lambda d, l: (d.city == l.id, (new_loc_id := l.id, new_loc_name := l.name, new_loc_code := l.code))))
 
-for clause in emp._query._clauses:
-    print(clause)
+_dump(emp)
 
 dep = lq.table("db", "department", {"id": int, "name": str, "city": str, "code": str})
 dep.extend(lambda e: (id_plus_one := e.id + 1))
 
 print(dep._query._table.columns)
 
-for clause in dep._query._clauses:
-    print(clause)
+_dump(dep)
 
 [emp, dep] = lq.db("db",{
     "employees": {"id": int, "name": str, "dept_id": str, "salary": float},
@@ -177,8 +172,7 @@ dep.rename(lambda d: (new_dept_id := d.id, new_dept_name := d.name))
 
 print(dep._query._table.columns)
 
-for clause in dep._query._clauses:
-    print(clause)
+_dump(dep)
 
 
 dep = lq.table("db","department", {"id": int, "name": str, "city": str, "code": str})
@@ -186,8 +180,7 @@ dep.select(lambda d: [d.id, d.name])
 
 print(dep._query._table.columns)
 
-for clause in dep._query._clauses:
-    print(clause)
+_dump(dep)
 
 
 dep = lq.table("db", "department", {"id": int, "name": str, "city": str, "code": str})
@@ -195,5 +188,4 @@ dep.group_by(lambda d: aggregate([d.id, d.name], [sum_test := sum(d.code), count
 
 print(dep._query._table.columns)
 
-for clause in dep._query._clauses:
-    print(clause)
+_dump(dep)
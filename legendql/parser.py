@@ -5,12 +5,16 @@ This module provides utilities for parsing Python lambda functions
 and converting them to SQL expressions.
 """
 import ast
-import importlib
 import inspect
+import linecache
+import weakref
 from _ast import operator, arg
+from datetime import date
 from enum import Enum
+from functools import lru_cache
 from typing import Callable, List, Union, Dict, Tuple
 
+from model import functions
 from model.functions import StringConcatFunction
 from model.metamodel import Expression, BinaryExpression, BinaryOperator, \
     ColumnReferenceExpression, BooleanLiteral, IfExpression, OrderByExpression, \
@@ -21,7 +25,8 @@ from model.metamodel import Expression, BinaryExpression, BinaryOperator, \
     AddBinaryOperator, SubtractBinaryOperator, MultiplyBinaryOperator, DivideBinaryOperator, BitwiseOrBinaryOperator, \
     BitwiseAndBinaryOperator, DateLiteral, GroupByExpression, \
     DescendingOrderType, ComputedColumnAliasExpression, AscendingOrderType, ColumnAliasExpression, LambdaExpression, \
-    VariableAliasExpression, MapReduceExpression, UnaryExpression, NotUnaryOperator, ModuloFunction, ExponentFunction
+    VariableAliasExpression, MapReduceExpression, UnaryExpression, NotUnaryOperator, ModuloFunction, ExponentFunction, \
+    LiteralExpression
 from model.schema import Table
 
 class ParseType(Enum):
@@ -35,6 +40,39 @@ class ParseType(Enum):
     lambda_body = "lambda_body"
     over = "over"
 
+_COMPARISON_OPERATORS = {
+    ast.Eq: EqualsBinaryOperator,
+    ast.NotEq: NotEqualsBinaryOperator,
+    ast.Lt: LessThanBinaryOperator,
+    ast.LtE: LessThanEqualsBinaryOperator,
+    ast.Gt: GreaterThanBinaryOperator,
+    ast.GtE: GreaterThanEqualsBinaryOperator,
+    ast.In: InBinaryOperator,
+    ast.NotIn: NotInBinaryOperator,
+    ast.Is: IsBinaryOperator,
+    ast.IsNot: IsNotBinaryOperator,
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: AddBinaryOperator,
+    ast.Sub: SubtractBinaryOperator,
+    ast.Mult: MultiplyBinaryOperator,
+    ast.Div: DivideBinaryOperator,
+    ast.BitOr: BitwiseOrBinaryOperator,
+    ast.BitAnd: BitwiseAndBinaryOperator,
+}
+
+@lru_cache(maxsize=None)
+def _function_class(name: str) -> type:
+    return getattr(functions, f"{name.title()}Function")
+
+# filename -> (source lines, parsed module), reused while linecache holds the same lines
+_module_asts = {}
+
+# code object -> lambda node; the node is only read during parsing, so re-parsing a lambda can share it.
+# weakly keyed, so an entry goes away with its code object (re-run notebook cells, exec'd pipelines)
+_lambda_nodes = weakref.WeakKeyDictionary()
+
 class Parser:
 
     @staticmethod
@@ -99,13 +137,70 @@ class Parser:
 
     @staticmethod
     def _get_lambda_node(func):
+        code = func.__code__
+        lambda_node = _lambda_nodes.get(code)
+        if lambda_node is None:
+            lambda_node = _lambda_nodes[code] = Parser._find_lambda_node(func)
+        return lambda_node
+
+    @staticmethod
+    def _find_lambda_node(func):
+        code = func.__code__
+        module_ast = Parser._get_module_ast(code.co_filename, func.__globals__)
+        if module_ast is None:
+            return Parser._get_lambda_node_from_source(func)
+
+        # the lambda starts on the code object's first line; when several do, its instructions sit inside its body
+        lambdas = [node for node in ast.walk(module_ast) if isinstance(node, ast.Lambda) and node.lineno == code.co_firstlineno]
+        if len(lambdas) > 1:
+            positions = [(p[0], p[2]) for p in code.co_positions() if p[0] is not None and p[2] is not None]
+            located = [node for node in lambdas if any(Parser._in_body(node, position) for position in positions)]
+            # bodies that are only a constant carry no column positions, so compare compiled instructions instead
+            lambdas = located or [node for node in lambdas if Parser._same_code(node, code)]
+            lambdas.sort(key=lambda node: (node.body.lineno, node.body.col_offset))
+
+        if not lambdas:
+            return Parser._get_lambda_node_from_source(func)
+
+        return lambdas[-1]
+
+    @staticmethod
+    def _in_body(node: ast.Lambda, position: Tuple[int, int]) -> bool:
+        return (node.body.lineno, node.body.col_offset) <= position < (node.body.end_lineno, node.body.end_col_offset)
+
+    @staticmethod
+    def _same_code(node: ast.Lambda, code) -> bool:
+        compiled = compile(ast.Expression(node), code.co_filename, "eval")
+        candidate = next(const for const in compiled.co_consts if inspect.iscode(const))
+        return (candidate.co_code, candidate.co_consts, candidate.co_names) == (code.co_code, code.co_consts, code.co_names)
+
+    @staticmethod
+    def _get_module_ast(filename: str, module_globals: dict):
+        lines = linecache.getlines(filename, module_globals)
+        if not lines:
+            return None
+
+        cached = _module_asts.get(filename)
+        if cached is not None and cached[0] is lines:
+            return cached[1]
+
+        try:
+            module_ast = ast.parse("".join(lines))
+        except SyntaxError:
+            return None
+
+        _module_asts[filename] = (lines, module_ast)
+        return module_ast
+
+    @staticmethod
+    def _get_lambda_node_from_source(func):
         source_lines, _ = inspect.getsourcelines(func)
         source_text = ''.join(source_lines).strip().replace("\n", "")
 
         try:
             # if it is lambda on own line this should work
             source_ast = ast.parse(source_text)
-        except:
+        except SyntaxError:
             # fluent api way
             idx = source_text.find("lambda")
             source_text = source_text[idx:len(source_text) - 1]
@@ -113,14 +208,14 @@ class Parser:
             try:
                 # fluent api way
                 source_ast = ast.parse(source_text)
-            except:
+            except SyntaxError:
                 # is it on the last line? try to strip out one more
                 source_text = source_text[:len(source_text) - 1]
 
                 try:
                     source_ast = ast.parse(source_text)
-                except:
-                    raise ValueError(f"Could not get Lambda func: {source_text}")
+                except SyntaxError as e:
+                    raise ValueError(f"Could not get Lambda func: {source_text}") from e
 
         return next((node for node in ast.walk(source_ast) if isinstance(node, ast.Lambda)), None)
 
@@ -172,7 +267,7 @@ class Parser:
 
     @staticmethod
     def _parse_rename(node: ast.AST) -> List[ColumnReferenceExpression]:
-        if isinstance(node, ast.List) or isinstance(node, ast.Tuple):
+        if type(node) in (ast.List, ast.Tuple):
             return [item for sublist in map(lambda n: Parser._parse_rename(n), node.elts) for item in sublist]
 
         if isinstance(node, ast.NamedExpr) and isinstance(node.target, ast.Name) and isinstance(node.value, ast.Attribute):
@@ -190,7 +285,7 @@ class Parser:
             group_by_table = Table(new_table.table, {})
             selections = Parser._parse_select(node.args[0], group_by_table)
 
-            expressions_and_aliases = list(map(lambda n: Parser._parse_group_by_map_aggregate(n, args, new_table, group_by_table), node.args[1].elts if isinstance(node.args[1], ast.List) or isinstance(node.args[1], ast.Tuple) else [node.args[1]]))
+            expressions_and_aliases = list(map(lambda n: Parser._parse_group_by_map_aggregate(n, args, new_table, group_by_table), node.args[1].elts if type(node.args[1]) in (ast.List, ast.Tuple) else [node.args[1]]))
             expressions = list(map(lambda e: e[0], expressions_and_aliases))
             implicit_aliases = list(map(lambda e: e[1], expressions_and_aliases))
 
@@ -211,9 +306,7 @@ class Parser:
             if isinstance(node.value, ast.Call):
                 map_expression = LambdaExpression(list(map(lambda a: a.arg, args)), Parser._parse_lambda_body(node.value.args[0], args, full_table))
                 # very brittle, lots more checks needed here
-                module = importlib.import_module("model.functions")
-                class_ = getattr(module, f"{node.value.func.id.title()}Function")
-                function_instance = class_()
+                function_instance = _function_class(node.value.func.id)()
                 function_argument = args[0].arg
                 reduce_expression = LambdaExpression(list(map(lambda a: a.arg, args)), FunctionExpression(function_instance, [VariableAliasExpression(function_argument)]))
                 return (ComputedColumnAliasExpression(computed_column, MapReduceExpression(map_expression, reduce_expression)), {computed_column: function_argument})
@@ -263,234 +356,211 @@ class Parser:
         if node is None:
             raise ValueError("node in Parser._parse_expression is None")
 
-        if isinstance(node, ast.NamedExpr):
-            new_table.columns[node.target.id] = None
-            return ColumnAliasExpression(node.target.id, Parser._parse_lambda_body(node.value, args, new_table, implicit_aliases))
+        match node:
+            case ast.NamedExpr():
+                new_table.columns[node.target.id] = None
+                return ColumnAliasExpression(node.target.id, Parser._parse_lambda_body(node.value, args, new_table, implicit_aliases))
+
+            case ast.Compare():
+                # Handle comparison operations (e.g., x > 5, y == 'value')
+                left = Parser._parse_lambda_body(node.left, args, new_table, implicit_aliases)
+
+                # We only handle the first comparator for simplicity
+                # In a real implementation, we would handle multiple comparators
+                op = node.ops[0]
+                right = Parser._parse_lambda_body(node.comparators[0], args, new_table, implicit_aliases)
+
+                comp_op = Parser._get_comparison_operator(op)
+
+                # Ensure left and right are Expression objects, not lists or tuples
+                if type(left) in (list, tuple):
+                    raise ValueError(f"Unsupported Compare object {left}")
+                if type(right) in (list, tuple):
+                    raise ValueError(f"Unsupported Compare object {right}")
+
+                return BinaryExpression(left=OperandExpression(left), operator=comp_op, right=OperandExpression(right))
 
-        if isinstance(node, ast.Compare):
-            # Handle comparison operations (e.g., x > 5, y == 'value')
-            left = Parser._parse_lambda_body(node.left, args, new_table, implicit_aliases)
+            case ast.BinOp():
+                # Handle binary operations (e.g., x + y, x - y, x * y)
+                left = Parser._parse_lambda_body(node.left, args, new_table, implicit_aliases)
+                right = Parser._parse_lambda_body(node.right, args, new_table, implicit_aliases)
 
-            # We only handle the first comparator for simplicity
-            # In a real implementation, we would handle multiple comparators
-            op = node.ops[0]
-            right = Parser._parse_lambda_body(node.comparators[0], args, new_table, implicit_aliases)
+                if isinstance(node.op, ast.Mod):
+                    return FunctionExpression(parameters=[left, right], function=ModuloFunction())
+                elif isinstance(node.op, ast.Pow):
+                    return FunctionExpression(parameters=[left, right], function=ExponentFunction())
 
-            comp_op = Parser._get_comparison_operator(op)
+                comp_op = Parser._get_binary_operator(node.op)
 
-            # Ensure left and right are Expression objects, not lists or tuples
-            if isinstance(left, list) or isinstance(left, tuple):
-                raise ValueError(f"Unsupported Compare object {left}")
-            if isinstance(right, list) or isinstance(right, tuple):
-                raise ValueError(f"Unsupported Compare object {right}")
+                # Ensure left and right are Expression objects, not lists or tuples
+                if type(left) in (list, tuple):
+                    raise ValueError(f"Unsupported BinOp object {left}")
+                if type(right) in (list, tuple):
+                    raise ValueError(f"Unsupported BinOp object {right}")
 
-            return BinaryExpression(left=OperandExpression(left), operator=comp_op, right=OperandExpression(right))
+                return BinaryExpression(left=OperandExpression(left), operator=comp_op, right=OperandExpression(right))
 
-        elif isinstance(node, ast.BinOp):
-            # Handle binary operations (e.g., x + y, x - y, x * y)
-            left = Parser._parse_lambda_body(node.left, args, new_table, implicit_aliases)
-            right = Parser._parse_lambda_body(node.right, args, new_table, implicit_aliases)
+            case ast.BoolOp():
+                # Handle boolean operations (e.g., x and y, x or y)
+                values = [Parser._parse_lambda_body(val, args, new_table, implicit_aliases) for val in node.values]
 
-            if isinstance(node.op, ast.Mod):
-                return FunctionExpression(parameters=[left, right], function=ModuloFunction())
-            elif isinstance(node.op, ast.Pow):
-                return FunctionExpression(parameters=[left, right], function=ExponentFunction())
+                # Combine the values with the appropriate operator
+                comp_op = AndBinaryOperator() if isinstance(node.op, ast.And) else OrBinaryOperator()
 
-            comp_op = Parser._get_binary_operator(node.op)
+                # Ensure all values are Expression objects, not lists or tuples
+                for val in values:
+                    if type(val) in (list, tuple):
+                        raise ValueError(f"Unsupported BoolOp object {val}")
 
-            # Ensure left and right are Expression objects, not lists or tuples
-            if isinstance(left, list) or isinstance(left, tuple):
-                raise ValueError(f"Unsupported BinOp object {left}")
-            if isinstance(right, list) or isinstance(right, tuple):
-                raise ValueError(f"Unsupported BinOp object {right}")
+                # Start with the first two values
+                result = BinaryExpression(left=OperandExpression(values[0]), operator=comp_op, right=OperandExpression(values[1]))
 
-            return BinaryExpression(left=OperandExpression(left), operator=comp_op, right=OperandExpression(right))
+                # Add the remaining values
+                for value in values[2:]:
+                    result = BinaryExpression(left=OperandExpression(result), operator=comp_op, right=OperandExpression(value))
 
-        elif isinstance(node, ast.BoolOp):
-            # Handle boolean operations (e.g., x and y, x or y)
-            values = [Parser._parse_lambda_body(val, args, new_table, implicit_aliases) for val in node.values]
+                return result
 
-            # Combine the values with the appropriate operator
-            comp_op = AndBinaryOperator() if isinstance(node.op, ast.And) else OrBinaryOperator()
+            case ast.Attribute():
+                # Handle column references (e.g. x.column_name)
+                if isinstance(node.value, ast.Name):
+                    # validate the column name
+                    if not new_table.validate_column(node.attr):
+                        raise ValueError(f"Column '{node.attr}' not found in table '{new_table}'")
 
-            # Ensure all values are Expression objects, not lists or tuples
-            processed_values = []
-            for val in values:
-                if isinstance(val, list) or isinstance(val, tuple):
-                    raise ValueError(f"Unsupported BoolOp object {val}")
+                    return ColumnAliasExpression(alias=node.value.id, reference=ColumnReferenceExpression(name=node.attr))
+
+            case ast.Name():
+                if node.id == "True":
+                    return LiteralExpression(BooleanLiteral(True))
+                elif node.id == "False":
+                    return LiteralExpression(BooleanLiteral(False))
+                else:
+                    alias = implicit_aliases.get(node.id, None) if implicit_aliases else None
+                    if alias:
+                        return ColumnAliasExpression(alias, ColumnReferenceExpression(node.id))
+                    return ColumnReferenceExpression(node.id)
+
+            case ast.Constant():
+                # Handle literal values (e.g., 5, 'value', True)
+                if isinstance(node.value, int):
+                    return LiteralExpression(IntegerLiteral(node.value))
+                if isinstance(node.value, bool):
+                    return LiteralExpression(BooleanLiteral(node.value))
+                if isinstance(node.value, str):
+                    return LiteralExpression(StringLiteral(node.value))
+
+                raise ValueError(f"Cannot convert literal type {type(node.value)}")
+
+            case ast.UnaryOp():
+                # Handle unary operations (e.g., not x)
+                operand = Parser._parse_lambda_body(node.operand, args, new_table, implicit_aliases)
+
+                # Ensure operand is an Expression object, not a list or tuple
+                if type(operand) in (list, tuple):
+                    # Use a fallback for list/tuple values in unary operations
+                    raise ValueError(f"Unsupported expression to UnaryOp: {operand}")
+
+                if isinstance(node.op, ast.Not):
+                    return UnaryExpression(operator=NotUnaryOperator(), expression=OperandExpression(operand))
                 else:
-                    processed_values.append(val)
-
-            # Start with the first two values
-            result = BinaryExpression(left=OperandExpression(processed_values[0]), operator=comp_op, right=OperandExpression(processed_values[1]))
-
-            # Add the remaining values
-            for value in processed_values[2:]:
-                result = BinaryExpression(left=OperandExpression(result), operator=comp_op, right=OperandExpression(value))
-
-            return result
-
-        elif isinstance(node, ast.Attribute):
-            # Handle column references (e.g. x.column_name)
-            if isinstance(node.value, ast.Name):
-                # validate the column name
-                if not new_table.validate_column(node.attr):
-                    raise ValueError(f"Column '{node.attr}' not found in table '{new_table}'")
-
-                return ColumnAliasExpression(alias=node.value.id, reference=ColumnReferenceExpression(name=node.attr))
-
-        elif isinstance(node, ast.Name):
-            if node.id == "True":
-                from model.metamodel import LiteralExpression
-                return LiteralExpression(BooleanLiteral(True))
-            elif node.id == "False":
-                from model.metamodel import LiteralExpression
-                return LiteralExpression(BooleanLiteral(False))
-            else:
-                alias = implicit_aliases.get(node.id, None) if implicit_aliases else None
-                if alias:
-                    return ColumnAliasExpression(alias, ColumnReferenceExpression(node.id))
-                return ColumnReferenceExpression(node.id)
-
-        elif isinstance(node, ast.Constant):
-            # Handle literal values (e.g., 5, 'value', True)
-            from model.metamodel import LiteralExpression
-            if isinstance(node.value, int):
-                return LiteralExpression(IntegerLiteral(node.value))
-            if isinstance(node.value, bool):
-                return LiteralExpression(BooleanLiteral(node.value))
-            if isinstance(node.value, str):
-                return LiteralExpression(StringLiteral(node.value))
-
-            raise ValueError(f"Cannot convert literal type {type(node.value)}")
-
-        elif isinstance(node, ast.UnaryOp):
-            # Handle unary operations (e.g., not x)
-            operand = Parser._parse_lambda_body(node.operand, args, new_table, implicit_aliases)
-
-            # Ensure operand is an Expression object, not a list or tuple
-            if isinstance(operand, list) or isinstance(operand, tuple):
-                # Use a fallback for list/tuple values in unary operations
-                raise ValueError(f"Unsupported expression to UnaryOp: {operand}")
-
-            if isinstance(node.op, ast.Not):
-                return UnaryExpression(operator=NotUnaryOperator(), expression=OperandExpression(operand))
-            else:
-                # Other unary operations (e.g., +, -)
+                    # Other unary operations (e.g., +, -)
+                    # In a real implementation, we would handle this more robustly
+                    return Parser._parse_lambda_body(node.operand, args, new_table, implicit_aliases)
+
+            case ast.IfExp():
+                # Handle conditional expressions (e.g., x if y else z)
                 # In a real implementation, we would handle this more robustly
-                return Parser._parse_lambda_body(node.operand, args, new_table, implicit_aliases)
-
-        elif isinstance(node, ast.IfExp):
-            # Handle conditional expressions (e.g., x if y else z)
-            # In a real implementation, we would handle this more robustly
-            test = Parser._parse_lambda_body(node.test, args, new_table, implicit_aliases)
-            body = Parser._parse_lambda_body(node.body, args, new_table, implicit_aliases)
-            orelse = Parser._parse_lambda_body(node.orelse, args, new_table, implicit_aliases)
-
-            # Ensure all values are Expression objects, not lists or tuples
-            if isinstance(test, list) or isinstance(test, tuple):
-                raise ValueError(f"Unsupported IfExp: {test}")
-            if isinstance(body, list) or isinstance(body, tuple):
-                raise ValueError(f"Unsupported IfExp: {body}")
-            if isinstance(orelse, list) or isinstance(orelse, tuple):
-                raise ValueError(f"Unsupported IfExp: {orelse}")
-
-            # Create a CASE WHEN expression
-            return IfExpression(test=test, body=body, orelse=orelse)
-
-        elif isinstance(node, ast.List):
-            # Handle tuples and lists (e.g., (1, 2, 3), [1, 2, 3])
-            # This is used for array returns in lambdas like lambda x: [x.name, x.age]
-            elements = []
-            for elt in node.elts:
-                elements.append(Parser._parse_lambda_body(elt, args, new_table, implicit_aliases))
-            return elements
+                test = Parser._parse_lambda_body(node.test, args, new_table, implicit_aliases)
+                body = Parser._parse_lambda_body(node.body, args, new_table, implicit_aliases)
+                orelse = Parser._parse_lambda_body(node.orelse, args, new_table, implicit_aliases)
+
+                # Ensure all values are Expression objects, not lists or tuples
+                if type(test) in (list, tuple):
+                    raise ValueError(f"Unsupported IfExp: {test}")
+                if type(body) in (list, tuple):
+                    raise ValueError(f"Unsupported IfExp: {body}")
+                if type(orelse) in (list, tuple):
+                    raise ValueError(f"Unsupported IfExp: {orelse}")
+
+                # Create a CASE WHEN expression
+                return IfExpression(test=test, body=body, orelse=orelse)
+
+            case ast.List():
+                # Handle tuples and lists (e.g., (1, 2, 3), [1, 2, 3])
+                # This is used for array returns in lambdas like lambda x: [x.name, x.age]
+                return [Parser._parse_lambda_body(elt, args, new_table, implicit_aliases) for elt in node.elts]
+
+            case ast.Tuple():
+                # Handle Join with rename ( x.col1 == y.col1, [ (x_col1 := x.col1 ), (y_col1 := y.col1 ) ]
+                return [Parser._parse_lambda_body(elt, args, new_table, implicit_aliases) for elt in node.elts]
+
+            case ast.Call():
+                # Handle function calls (e.g., sum(x.col1 - x.col2))
+                args_list = []
+                # kwargs = {}
 
-        elif isinstance(node, ast.Tuple):
-            # Handle Join with rename ( x.col1 == y.col1, [ (x_col1 := x.col1 ), (y_col1 := y.col1 ) ]
-            elements = []
-            for elt in node.elts:
-                elements.append(Parser._parse_lambda_body(elt, args, new_table, implicit_aliases))
-            return elements
+                if isinstance(node.func, ast.Name):
+                    # Parse the arguments to the function
 
-        elif isinstance(node, ast.Call):
-            # Handle function calls (e.g., sum(x.col1 - x.col2))
-            args_list = []
-            # kwargs = {}
+                    args_list = [Parser._parse_lambda_body(arg, args, new_table, implicit_aliases) for arg in node.args]
 
-            if isinstance(node.func, ast.Name):
-                # Parse the arguments to the function
+                    # Handle keyword arguments
+                    args_list += [Parser._parse_lambda_body(kw.value, args, new_table, implicit_aliases) for kw in node.keywords]
 
-                for arg in node.args:
-                    parsed_arg = Parser._parse_lambda_body(arg, args, new_table, implicit_aliases)
-                    args_list.append(parsed_arg)
+                else:
+                    ValueError(f"Unsupported function type: {node.func}")
 
-                # Handle keyword arguments
-                # kwargs = {}
-                for kw in node.keywords:
-                    parsed_kw = Parser._parse_lambda_body(kw.value, args, new_table, implicit_aliases)
-                    # kwargs[kw.arg] = parsed_kw
-                    args_list.append(parsed_kw)
-
-            else:
-                ValueError(f"Unsupported function type: {node.func}")
-
-            if node.func.id == "date":
-                from model.metamodel import LiteralExpression
-                from datetime import date
-                # random use of date to prevent auto-format refactorings deleting the import
-                date(1999, 1, 1)
-                compiled = compile(ast.fix_missing_locations(ast.Expression(body=node)), '', 'eval')
-                val = eval(compiled, None, None)
-                return LiteralExpression(literal=DateLiteral(val))
-
-            #if node.func.id not in known_functions:
-            #    ValueError(f"Unknown function name: {node.func.id}")
-
-            # very brittle, lots more checks needed here
-            module = importlib.import_module("model.functions")
-            class_ = getattr(module, f"{node.func.id.title()}Function")
-            instance = class_()
-            return FunctionExpression(instance, parameters=args_list)
-
-        elif isinstance(node, ast.JoinedStr):
-            # Handle fstring (e.g. f"hello{blah}")
-            # In a real implementation, we would handle this more robustly
-            expr = []
-            for value in node.values:
-                if isinstance(value, ast.Constant):
-                    expr.append(Parser._parse_lambda_body(value, args, new_table, implicit_aliases))
-                elif isinstance(value, ast.FormattedValue):
-                    if value.format_spec is not None:
-                        raise ValueError(f"Format Spec Not Supported: {value.format_spec}")
-                    else:
-                        expr.append(Parser._parse_lambda_body(value.value, args, new_table, implicit_aliases))
-
-            return FunctionExpression(StringConcatFunction(), expr)
-
-        elif isinstance(node, ast.Subscript):
-            # Handle subscript operations (e.g., x[0], x['key'])
-            # In a real implementation, we would handle this more robustly
-            raise ValueError(f"Unsupported expression: {node}")
-
-        elif isinstance(node, ast.Dict):
-            # Handle dictionaries (e.g., {'a': 1, 'b': 2})
-            # In a real implementation, we would handle this more robustly
-            raise ValueError(f"Unsupported expression: {node}")
-
-        elif isinstance(node, ast.Set):
-            # Handle sets (e.g., {1, 2, 3})
-            # In a real implementation, we would handle this more robustly
-            raise ValueError(f"Unsupported expression: {node}")
-
-        elif isinstance(node, ast.ListComp) or isinstance(node, ast.SetComp) or isinstance(node, ast.DictComp) or isinstance(node, ast.GeneratorExp):
-            # Handle comprehensions (e.g., [x for x in y], {x: y for x in z})
-            # In a real implementation, we would handle this more robustly
-            raise ValueError(f"Unsupported expression: {node}")
-
-        else:
-            # Throw
-            raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+                if node.func.id == "date":
+                    compiled = compile(ast.fix_missing_locations(ast.Expression(body=node)), '', 'eval')
+                    val = eval(compiled, {"date": date})
+                    return LiteralExpression(literal=DateLiteral(val))
+
+                #if node.func.id not in known_functions:
+                #    ValueError(f"Unknown function name: {node.func.id}")
+
+                # very brittle, lots more checks needed here
+                instance = _function_class(node.func.id)()
+                return FunctionExpression(instance, parameters=args_list)
+
+            case ast.JoinedStr():
+                # Handle fstring (e.g. f"hello{blah}")
+                # In a real implementation, we would handle this more robustly
+                expr = []
+                for value in node.values:
+                    if isinstance(value, ast.Constant):
+                        expr.append(Parser._parse_lambda_body(value, args, new_table, implicit_aliases))
+                    elif isinstance(value, ast.FormattedValue):
+                        if value.format_spec is not None:
+                            raise ValueError(f"Format Spec Not Supported: {value.format_spec}")
+                        else:
+                            expr.append(Parser._parse_lambda_body(value.value, args, new_table, implicit_aliases))
+
+                return FunctionExpression(StringConcatFunction(), expr)
+
+            case ast.Subscript():
+                # Handle subscript operations (e.g., x[0], x['key'])
+                # In a real implementation, we would handle this more robustly
+                raise ValueError(f"Unsupported expression: {node}")
+
+            case ast.Dict():
+                # Handle dictionaries (e.g., {'a': 1, 'b': 2})
+                # In a real implementation, we would handle this more robustly
+                raise ValueError(f"Unsupported expression: {node}")
+
+            case ast.Set():
+                # Handle sets (e.g., {1, 2, 3})
+                # In a real implementation, we would handle this more robustly
+                raise ValueError(f"Unsupported expression: {node}")
+
+            case ast.ListComp() | ast.SetComp() | ast.DictComp() | ast.GeneratorExp():
+                # Handle comprehensions (e.g., [x for x in y], {x: y for x in z})
+                # In a real implementation, we would handle this more robustly
+                raise ValueError(f"Unsupported expression: {node}")
+
+            case _:
+                # Throw
+                raise ValueError(f"Unsupported expression: {ast.dump(node)}")
 
         return ColumnReferenceExpression("PLACEHOLDER")
 
@@ -505,43 +575,15 @@ class Parser:
         Returns:
             The equivalent SQL operator
         """
-        if isinstance(op, ast.Eq):
-            return EqualsBinaryOperator()
-        elif isinstance(op, ast.NotEq):
-            return NotEqualsBinaryOperator()
-        elif isinstance(op, ast.Lt):
-            return LessThanBinaryOperator()
-        elif isinstance(op, ast.LtE):
-            return LessThanEqualsBinaryOperator()
-        elif isinstance(op, ast.Gt):
-            return GreaterThanBinaryOperator()
-        elif isinstance(op, ast.GtE):
-            return GreaterThanEqualsBinaryOperator()
-        elif isinstance(op, ast.In):
-            return InBinaryOperator()
-        elif isinstance(op, ast.NotIn):
-            return NotInBinaryOperator()
-        elif isinstance(op, ast.Is):
-            return IsBinaryOperator()
-        elif isinstance(op, ast.IsNot):
-            return IsNotBinaryOperator()
-        else:
+        operator_class = _COMPARISON_OPERATORS.get(type(op))
+        if operator_class is None:
             raise ValueError(f"Unsupported comparison operator {op}")
+        return operator_class()
 
     @staticmethod
     def _get_binary_operator(op: operator) -> BinaryOperator:
         # Map Python operators to Binary operators
-        if isinstance(op, ast.Add):
-            return AddBinaryOperator()
-        elif isinstance(op, ast.Sub):
-            return SubtractBinaryOperator()
-        elif isinstance(op, ast.Mult):
-            return MultiplyBinaryOperator()
-        elif isinstance(op, ast.Div):
-            return DivideBinaryOperator()
-        elif isinstance(op, ast.BitOr):
-            return BitwiseOrBinaryOperator()
-        elif isinstance(op, ast.BitAnd):
-            return BitwiseAndBinaryOperator()
-        else:
+        operator_class = _BINARY_OPERATORS.get(type(op))
+        if operator_class is None:
             raise ValueError(f"Unsupported binary operator {op}")
+        return operator_class()
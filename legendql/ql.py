@@ -1,16 +1,28 @@
 from __future__ import annotations
 
-from typing import Callable, Type, Dict
+from dataclasses import is_dataclass, fields
+from typing import Callable, Type, Dict, Set
 
 from legendql import parser
 from model.metamodel import FromClause, OrderByClause, LimitClause, IntegerLiteral, OffsetClause, RenameClause, \
     LeftJoinType, InnerJoinType, Runtime, DataFrame
 from legendql.parser import ParseType
-from model.metamodel import SelectionClause, ExtendClause, FilterClause, GroupByClause, JoinClause, JoinType
+from model.metamodel import SelectionClause, ExtendClause, FilterClause, GroupByClause, JoinClause, JoinType, \
+    ColumnReferenceExpression
 from model.schema import Table, Database
 from legendql.query import Query
 
 
+def _referenced_columns(node) -> Set[str]:
+    if type(node) is ColumnReferenceExpression:
+        return {node.name}
+    if type(node) is list:
+        return set().union(*map(_referenced_columns, node))
+    if is_dataclass(node):
+        return set().union(*(_referenced_columns(getattr(node, f.name)) for f in fields(node)))
+    return set()
+
+
 class LegendQL:
 
     def __init__(self, database: Database, table: Table):
@@ -40,10 +52,20 @@ class LegendQL:
         self._query._update_table(expression_and_table[1])
         return self
 
-    def extend(self, columns: Callable) -> LegendQL:
-        expression_and_table = parser.Parser.parse(columns, [self._query._table], ParseType.extend)
-        self._query._add_clause(ExtendClause(expression_and_table[0]))
-        self._query._update_table(expression_and_table[1])
+    def extend(self, columns: Callable, *more_columns: Callable) -> LegendQL:
+        # callables fuse into one ExtendClause, but Pure types every column against the clause's input,
+        # so a callable reading a column added earlier in this call starts a new clause
+        expressions = []
+        added = set()
+        for column in (columns, *more_columns):
+            expression_and_table = parser.Parser.parse(column, [self._query._table], ParseType.extend)
+            if not added.isdisjoint(_referenced_columns(expression_and_table[0])):
+                self._query._add_clause(ExtendClause(expressions))
+                expressions, added = [], set()
+            expressions.extend(expression_and_table[0])
+            added.update(expression.alias for expression in expression_and_table[0])
+            self._query._update_table(expression_and_table[1])
+        self._query._add_clause(ExtendClause(expressions))
         return self
 
     def rename(self, columns: Callable) -> LegendQL:
@@ -26,7 +26,8 @@ class Query:
         return Query.from_table(database, Table(table, columns))
 
     def bind[R: Runtime](self, runtime: R) -> DataFrame:
-        return DataFrame(runtime, self._clauses)
+        # snapshot the clauses so further chaining on this query can't change an already bound frame
+        return DataFrame(runtime, list(self._clauses))
 
     def eval[R: Runtime, T](self, runtime: R) -> DataFrame:
         return self.bind(runtime).eval()
@@ -1,10 +1,22 @@
 from __future__ import annotations
+import sys
 from abc import ABC, abstractmethod
 from datetime import date
 from typing import List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+# operators, join types and order types carry no state, so each class only ever needs one instance
+_MARKERS = {}
+
+def _marker_new(cls):
+    instance = _MARKERS.get(cls)
+    if instance is None:
+        instance = _MARKERS[cls] = object.__new__(cls)
+    return instance
 
 class Literal[T](ABC):
+    __slots__ = ()
+
     @abstractmethod
     def value(self) -> T:
         pass
@@ -13,11 +25,9 @@ class Literal[T](ABC):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IntegerLiteral(Literal):
     val: int
-    def __init__(self, val):
-        self.val = val
 
     def value(self) -> int:
         return self.val
@@ -25,11 +35,9 @@ class IntegerLiteral(Literal):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_integer_literal(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StringLiteral(Literal):
     val: str
-    def __init__(self, val):
-        self.val = val
 
     def value(self) -> str:
         return self.val
@@ -37,11 +45,9 @@ class StringLiteral(Literal):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_string_literal(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DateLiteral(Literal):
     val: date
-    def __init__(self, val):
-        self.val = val
 
     def value(self) -> date:
         return self.val
@@ -49,11 +55,9 @@ class DateLiteral(Literal):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_date_literal(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BooleanLiteral(Literal):
     val: bool
-    def __init__(self, val):
-        self.val = val
 
     def value(self) -> bool:
         return self.val
@@ -62,149 +66,156 @@ class BooleanLiteral(Literal):
         return visitor.visit_boolean_literal(self, parameter)
 
 class Function(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         pass
 
-@dataclass
+@dataclass(slots=True)
 class CountFunction(Function):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_count_function(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class AverageFunction(Function):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_average_function(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class ModuloFunction(Function):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_modulo_function(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class ExponentFunction(Function):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_exponent_function(self, parameter)
 
 class Expression(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         pass
 
 class Operator(ABC):
+    __slots__ = ()
+    __new__ = _marker_new
+
     @abstractmethod
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         pass
 
 class UnaryOperator(Operator, ABC):
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class NotUnaryOperator(UnaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_not_unary_operator(self, parameter)
 
 class BinaryOperator(Operator, ABC):
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class EqualsBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_equals_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class NotEqualsBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_not_equals_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class GreaterThanBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_greater_than_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class GreaterThanEqualsBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_greater_than_equals_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class LessThanBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_less_than_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class LessThanEqualsBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_less_than_equals_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class InBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_in_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class NotInBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_not_in_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class IsBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_is_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class IsNotBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_is_not_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class AndBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_and_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class OrBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_or_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class AddBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_add_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class MultiplyBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_multiply_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class SubtractBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_subtract_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class DivideBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_divide_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class BitwiseAndBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_bitwise_and_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class BitwiseOrBinaryOperator(BinaryOperator):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_bitwise_or_binary_operator(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OperandExpression(Expression):
     expression: Expression
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_operand_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpression(Expression):
     operator: UnaryOperator
     expression: OperandExpression
@@ -212,7 +223,7 @@ class UnaryExpression(Expression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_unary_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpression(Expression):
     left: OperandExpression
     right: OperandExpression
@@ -221,42 +232,50 @@ class BinaryExpression(Expression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_binary_expression(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LiteralExpression(Expression):
     literal: Literal
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_literal_expression(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AliasExpression(Expression, ABC):
     alias: str = None
 
-@dataclass
+    def __post_init__(self):
+        if self.alias is not None:
+            object.__setattr__(self, "alias", sys.intern(self.alias))
+
+@dataclass(frozen=True, slots=True)
 class VariableAliasExpression(AliasExpression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_variable_alias_expression(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ColumnReferenceExpression(Expression):
     name: str
+
+    def __post_init__(self):
+        object.__setattr__(self, "name", sys.intern(self.name))
+
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_column_reference_expression(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ColumnAliasExpression(AliasExpression):
     reference: ColumnReferenceExpression = None
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_column_alias_expression(self, parameter)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ComputedColumnAliasExpression(AliasExpression):
     expression: Optional[Expression] = None
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_computed_column_alias_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class IfExpression(Expression):
     test: Expression
     body: Expression
@@ -266,19 +285,20 @@ class IfExpression(Expression):
         return visitor.visit_if_expression(self, parameter)
 
 class OrderType(Expression, ABC):
-    pass
+    __slots__ = ()
+    __new__ = _marker_new
 
-@dataclass
+@dataclass(slots=True)
 class AscendingOrderType(OrderType):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_ascending_order_type(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class DescendingOrderType(OrderType):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_descending_order_type(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class OrderByExpression(Expression):
     direction: OrderType
     expression: Expression
@@ -286,7 +306,7 @@ class OrderByExpression(Expression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_order_by_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class FunctionExpression(Expression):
     function: Function
     parameters: List[Expression]
@@ -294,14 +314,14 @@ class FunctionExpression(Expression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_function_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class MapReduceExpression(Expression):
     map_expression: Expression
     reduce_expression: Expression
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_map_reduce_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class LambdaExpression(Expression):
     parameters: List[str]
     expression: Expression
@@ -309,9 +329,9 @@ class LambdaExpression(Expression):
         return visitor.visit_lambda_expression(self, parameter)
 
 class Clause(ABC):
-    pass
+    __slots__ = ()
 
-@dataclass
+@dataclass(slots=True)
 class RenameClause(Clause):
     columnAliases: List[ColumnAliasExpression]
 
@@ -319,35 +339,35 @@ class RenameClause(Clause):
         return visitor.visit_rename_clause(self, parameter)
 
 
-@dataclass
+@dataclass(slots=True)
 class FilterClause(Clause):
     expression: Expression
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_filter_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class SelectionClause(Clause):
     expressions: List[Expression]
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_selection_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class ExtendClause(Clause):
     expressions: List[Expression]
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_extend_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class GroupByClause(Clause):
     expression: Expression
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_group_by_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class GroupByExpression(Expression):
     selections: List[Expression]
     expressions: List[Expression]
@@ -356,57 +376,65 @@ class GroupByExpression(Expression):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_group_by_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class DistinctClause(Clause):
     expressions: List[Expression]
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_distinct_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class OrderByClause(Clause):
     ordering: List[OrderType]
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_order_by_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class LimitClause(Clause):
     value: IntegerLiteral
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_limit_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class FromClause(Clause):
     database: str
     table: str
+
+    def __post_init__(self):
+        self.database = sys.intern(self.database)
+        self.table = sys.intern(self.table)
+
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_from_clause(self, parameter)
 
 class JoinType(ABC):
+    __slots__ = ()
+    __new__ = _marker_new
+
     @abstractmethod
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         pass
 
-@dataclass
+@dataclass(slots=True)
 class InnerJoinType(JoinType):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_inner_join_type(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class LeftJoinType(JoinType):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_left_join_type(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class JoinExpression(Expression):
     on: Expression
 
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_join_expression(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class JoinClause(Clause):
     from_clause: FromClause
     join_type: JoinType
@@ -415,7 +443,7 @@ class JoinClause(Clause):
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_join_clause(self, parameter)
 
-@dataclass
+@dataclass(slots=True)
 class OffsetClause(Clause):
     value: IntegerLiteral
 
@@ -431,6 +459,10 @@ class Runtime(ABC):
     def executable_to_string(self, clauses: List[Clause]) -> str:
         pass
 
+    def eval_executable[T](self, executable: str, clauses: List[Clause]) -> T:
+        # runtimes that run the rendered text override this to skip rendering the clauses again
+        return self.eval(clauses)
+
     def visit[P, T](self, visitor: ExecutionVisitor, parameter: P) -> T:
         return visitor.visit_runtime(self, parameter)
 
@@ -439,18 +471,24 @@ class DataFrame[T](ABC):
     runtime: Runtime
     clauses: List[Clause]
     results: T = None
+    _executable: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def eval(self) -> DataFrame:
-        self.results = self.runtime.eval(self.clauses)
+        self.results = self.runtime.eval_executable(self.executable_to_string(), self.clauses)
         return self
 
     def data(self):
         return self.results
 
     def executable_to_string(self) -> str:
-        return self.runtime.executable_to_string(self.clauses)
+        # a bound frame's clauses don't change, so render them once
+        if self._executable is None:
+            self._executable = self.runtime.executable_to_string(self.clauses)
+        return self._executable
 
 class ExecutionVisitor(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def visit_runtime[P, T, R: Runtime](self, val: R, parameter: P) -> T:
         raise NotImplementedError()
@@ -5,12 +5,7 @@ from typing import Type
 from model.schema import Table, Database
 from runtime.pure.executionserver.runtime import DatabaseType
 
-@dataclass
-class DuckDBDatabaseType(DatabaseType):
-    path: str
-
-    def generate_pure_runtime(self, name: str, database: Database) -> str:
-        return f"""
+_RUNTIME_TEMPLATE = """
 ###Runtime
 Runtime {name}
 {{
@@ -19,7 +14,7 @@ Runtime {name}
   ];
   connections:
   [
-    {database.name}:
+    {database}:
     [
       connection: local::DuckDuckConnection
     ]
@@ -27,46 +22,57 @@ Runtime {name}
 }}
 """
 
-    def generate_pure_connection(self) -> str:
-        return f"""
+_CONNECTION_TEMPLATE = """
 ###Connection       
 RelationalDatabaseConnection local::DuckDuckConnection
 {{
   type: DuckDB;
   specification: DuckDB
   {{
-    path: '{self.path}';
+    path: '{path}';
   }};
   auth: Test;
 }}    
 """
 
-    def generate_pure_database(self, database: Database) -> str:
-        columns = []
-        tables = ""
-        for table in database.tables:
-            for (col, typ) in table.columns.items():
-                columns.append(f"{col} {self._python_type_to_db_type(typ)}")
-            tables += f"""
-  Table {table.table}
+_TABLE_TEMPLATE = """
+  Table {table}
   (
-    {",\n".join(columns)}
+    {columns}
   )
   
 """
-        return f"""
+
+_DATABASE_TEMPLATE = """
 ###Relational
-Database {database.name}
+Database {name}
 (
   {tables}
 )
 """
 
+@dataclass
+class DuckDBDatabaseType(DatabaseType):
+    path: str
+
+    def generate_pure_runtime(self, name: str, database: Database) -> str:
+        return _RUNTIME_TEMPLATE.format_map({"name": name, "database": database.name})
+
+    def generate_pure_connection(self) -> str:
+        return _CONNECTION_TEMPLATE.format_map({"path": self.path})
+
+    def generate_pure_database(self, database: Database) -> str:
+        tables = []
+        for table in database.tables:
+            columns = ",\n".join([f"{col} {self._python_type_to_db_type(typ)}" for (col, typ) in table.columns.items()])
+            tables.append(_TABLE_TEMPLATE.format_map({"table": table.table, "columns": columns}))
+        return _DATABASE_TEMPLATE.format_map({"name": database.name, "tables": "".join(tables)})
+
     def _python_type_to_db_type(self, typ: Type):
         if typ == str:
             return "VARCHAR(0)"
         if typ == int:
             return "BIGINT"
-        if type == date:
+        if typ == date:
             return "DATE"
         raise ValueError(f"Unsupported type {typ}")
\ No newline at end of file
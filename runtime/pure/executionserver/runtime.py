@@ -1,46 +1,97 @@
 import json
-from dataclasses import dataclass
-from typing import List, Any
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Any, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from dialect.purerelation.dialect import PureRuntime
 from model.metamodel import Clause
 from model.schema import Table, Database
 from runtime.pure.db.type import DatabaseType
 
-@dataclass
+PARSED_LAMBDA_CACHE_SIZE = 512
+
+@dataclass(slots=True)
 class TDS:
     relation: str
     sql: str
     header: List[str]
     rows: List[List[Any]]
-    pass
 
 @dataclass
 class ExecutionServerRuntime(PureRuntime):
     database_type: DatabaseType
     host: str
     database: Database
+    pool_size: int = 4
+    _parsed_lambdas: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False, compare=False)
+    _parsed_lambdas_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _parsed_model: Optional[Tuple[str, dict]] = field(default=None, init=False, repr=False, compare=False)
+    _session: Optional[requests.Session] = field(default=None, init=False, repr=False, compare=False)
+    _session_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def eval(self, clauses: List[Clause]) -> TDS:
-        lam = self.executable_to_string(clauses)
+        return self.eval_executable(self.executable_to_string(clauses), clauses)
+
+    def eval_executable(self, executable: str, clauses: List[Clause]) -> TDS:
         model = self._generate_model()
-        query = self._parse_lambda(lam)
+        query = self._parse_lambda(executable)
         pmcd = self._parse_model(model)
         runtime = pmcd["elements"][0]["runtimeValue"]
 
         execution_input = {"clientVersion": "vX_X_X", "context": {"_type": "BaseExecutionContext"}, "function": query, "runtime": runtime, "model": pmcd}
-        return self._parse_execution_response(lam, self._execute(execution_input))
+        return self._parse_execution_response(executable, self._execute(execution_input))
 
     def _parse_model(self, model: str) -> dict:
-        return requests.post(self.host + "/api/pure/v1/grammar/grammarToJson/model", data=model).json()
+        # the model only changes with the database, so reuse the last parse while its text is unchanged
+        if self._parsed_model is None or self._parsed_model[0] != model:
+            response = self._get_session().post(self.host + "/api/pure/v1/grammar/grammarToJson/model", data=model)
+            response.raise_for_status()
+            self._parsed_model = (model, response.json())
+        return self._parsed_model[1]
 
     def _parse_lambda(self, lam: str) -> dict:
-        return requests.post(self.host + "/api/pure/v1/grammar/grammarToJson/lambda", data="|" + lam).json()
+        # the same relation expression always parses to the same protocol json, so skip the round trip on repeat evals
+        with self._parsed_lambdas_lock:
+            query = self._parsed_lambdas.get(lam)
+            if query is not None:
+                self._parsed_lambdas.move_to_end(lam)
+                return query
+
+        # parse outside the lock so concurrent evals of different queries don't serialize on the server call
+        # and raise on an error response rather than caching its payload
+        response = self._get_session().post(self.host + "/api/pure/v1/grammar/grammarToJson/lambda", data="|" + lam)
+        response.raise_for_status()
+        query = response.json()
+        with self._parsed_lambdas_lock:
+            self._parsed_lambdas[lam] = query
+            if len(self._parsed_lambdas) > PARSED_LAMBDA_CACHE_SIZE:
+                self._parsed_lambdas.popitem(last=False)
+        return query
+
+    def _get_session(self) -> requests.Session:
+        # keep one session per runtime so every server call reuses the same keep-alive connection
+        # concurrent evals share at most pool_size connections, waiting for a free one rather than opening more
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
 
     def _execute(self, input: dict) -> dict:
-        return requests.post(self.host + "/api/pure/v1/execution/execute?serializationFormat=DEFAULT", json=input).json()
+        return self._get_session().post(self.host + "/api/pure/v1/execution/execute?serializationFormat=DEFAULT", json=input).json()
 
     def _generate_model(self) -> str:
         return self.database_type.generate_model(self.name, self.database)
@@ -49,7 +100,5 @@ class ExecutionServerRuntime(PureRuntime):
     def _parse_execution_response(relation: str, result: dict) -> TDS:
         sql = result["activities"][0]["sql"]
         headers = result["result"]["columns"]
-        rows = []
-        for row in result["result"]["rows"]:
-            rows.append(row["values"])
-        return TDS(relation, sql, headers, rows)
\ No newline at end of file
+        rows = [row["values"] for row in result["result"]["rows"]]
+        return TDS(relation, sql, headers, rows)
@@ -7,4 +7,7 @@ from runtime.pure.repl.repl_utils import send_to_repl
 
 class ReplRuntime(PureRuntime):
     def eval(self, clauses: List[Clause]) -> str:
-        return send_to_repl(self.executable_to_string(clauses))
+        return self.eval_executable(self.executable_to_string(clauses), clauses)
+
+    def eval_executable(self, executable: str, clauses: List[Clause]) -> str:
+        return send_to_repl(executable)
@@ -8,65 +8,80 @@ from legendql.ql import LegendQL
 
 class TestDslToPureRelationDialect(unittest.TestCase):
 
-    def setUp(self):
-        pass
+    @classmethod
+    def setUpClass(cls):
+        # LegendQL.from_table copies the table, so every test can share these
+        cls.runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
+        cls.table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
+        cls.database = Database("local::DuckDuckDatabase", [cls.table])
 
     def test_simple_select(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (LegendQL.from_table(database, table)
+        data_frame = (LegendQL.from_table(self.database, self.table)
                       .select(lambda e: [e.id, e.departmentId])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_filter(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (LegendQL.from_table(database, table)
+        data_frame = (LegendQL.from_table(self.database, self.table)
                       .select(lambda e: [e.id, e.departmentId])
                       .filter(lambda e: e.id == 1)
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->filter(e | $e.id==1)->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_extend(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (LegendQL.from_table(database, table)
+        data_frame = (LegendQL.from_table(self.database, self.table)
                       .select(lambda e: [e.id, e.departmentId])
                       .extend(lambda e: [new_col := e.id + 1])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->extend(~[new_col:e | $e.id+1])->from(local::DuckDuckRuntime)", pure_relation)
 
+    def test_simple_select_with_multiple_extends(self):
+        data_frame = (LegendQL.from_table(self.database, self.table)
+                      .select(lambda e: [e.id, e.departmentId])
+                      .extend(lambda e: (new_col := e.id + 1),
+                              lambda e: (other_col := e.departmentId + 2))
+                      .bind(self.runtime))
+        pure_relation = data_frame.executable_to_string()
+        self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->extend(~[new_col:e | $e.id+1, other_col:e | $e.departmentId+2])->from(local::DuckDuckRuntime)", pure_relation)
+
+    def test_simple_select_with_dependent_extends(self):
+        data_frame = (LegendQL.from_table(self.database, self.table)
+                      .select(lambda e: [e.id, e.departmentId])
+                      .extend(lambda e: (a1 := e.id + 1),
+                              lambda e: (b1 := e.a1 + 1),
+                              lambda e: (c1 := e.departmentId + 1))
+                      .bind(self.runtime))
+        pure_relation = data_frame.executable_to_string()
+        self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->extend(~[a1:e | $e.id+1])->extend(~[b1:e | $e.a1+1, c1:e | $e.departmentId+1])->from(local::DuckDuckRuntime)", pure_relation)
+
+    def test_extend_accepts_columns_keyword(self):
+        data_frame = (LegendQL.from_table(self.database, self.table)
+                      .extend(columns=lambda e: (new_col := e.id + 1))
+                      .bind(self.runtime))
+        pure_relation = data_frame.executable_to_string()
+        self.assertEqual("#>{local::DuckDuckDatabase.table}#->extend(~[new_col:e | $e.id+1])->from(local::DuckDuckRuntime)", pure_relation)
+
     @unittest.skip("need to support to-string for functions and clean up function metamodel")
     def test_simple_select_with_groupBy(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (LegendQL.from_table(database, table)
+        data_frame = (LegendQL.from_table(self.database, self.table)
                       .select(lambda e: [e.id, e.departmentId, e.first, e.last])
                       .group_by(lambda r: aggregate(
                                             [r.last],
                                             [sum_of_id := sum(r.id + 1)],
                                             having=sum_of_id > 0))
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId, first, last])->groupBy(~[last], ~[sum_of_id:r | $r.id+1 : a | $a->sum(), r | $r.sum_of_id > 0])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_simple_select_with_limit(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (LegendQL.from_table(database, table)
+        data_frame = (LegendQL.from_table(self.database, self.table)
                       .select(lambda e: [e.id, e.departmentId])
                       .limit(1)
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id, departmentId])->limit(1)->from(local::DuckDuckRuntime)", pure_relation)
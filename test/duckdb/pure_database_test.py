@@ -0,0 +1,22 @@
+import unittest
+from datetime import date
+
+from model.schema import Table, Database
+from runtime.pure.db.duckdb import DuckDBDatabaseType
+
+
+class TestDuckDBPureDatabase(unittest.TestCase):
+
+    def test_each_table_renders_only_its_own_columns(self):
+        employees = Table("employees", {"id": int, "name": str, "hired": date})
+        departments = Table("departments", {"code": str})
+        database = Database("local::DuckDuckDatabase", [employees, departments])
+
+        pure_database = DuckDBDatabaseType("/tmp/test.db").generate_pure_database(database)
+
+        employees_block = pure_database[pure_database.index("Table employees"):pure_database.index("Table departments")]
+        departments_block = pure_database[pure_database.index("Table departments"):]
+        self.assertIn("id BIGINT,\nname VARCHAR(0),\nhired DATE", employees_block)
+        self.assertIn("code VARCHAR(0)", departments_block)
+        self.assertNotIn("id BIGINT", departments_block)
+        self.assertNotIn("hired", departments_block)
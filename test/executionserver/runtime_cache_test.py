@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from model.schema import Table, Database
+from runtime.pure.executionserver import runtime as runtime_module
+from runtime.pure.executionserver.runtime import ExecutionServerRuntime
+
+table = Table("employees", {"id": int, "departmentId": int, "first": str, "last": str})
+database = Database("local::DuckDuckDatabase", [table])
+
+def _response(payload: dict) -> mock.Mock:
+    response = mock.Mock()
+    response.json.return_value = payload
+    return response
+
+def _error_response() -> mock.Mock:
+    response = mock.Mock()
+    response.raise_for_status.side_effect = requests.HTTPError("400 Client Error")
+    return response
+
+class TestExecutionServerRuntimeCaches(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.runtime = ExecutionServerRuntime("local::DuckDuckRuntime", mock.Mock(), "http://localhost:6300", database)
+        self.runtime._session = self.session
+
+    def test_parsed_lambda_is_reused(self):
+        self.session.post.side_effect = [_response({"lambda": "a"})]
+        self.assertEqual({"lambda": "a"}, self.runtime._parse_lambda("a"))
+        self.assertEqual({"lambda": "a"}, self.runtime._parse_lambda("a"))
+        self.assertEqual(1, self.session.post.call_count)
+
+    def test_parsed_lambdas_evict_least_recently_used(self):
+        self.session.post.side_effect = [_response({"lambda": name}) for name in ("a", "b", "c", "b")]
+        with mock.patch.object(runtime_module, "PARSED_LAMBDA_CACHE_SIZE", 2):
+            self.runtime._parse_lambda("a")
+            self.runtime._parse_lambda("b")
+            self.runtime._parse_lambda("a")
+            self.runtime._parse_lambda("c")
+            self.assertEqual(3, self.session.post.call_count)
+            # "b" was least recently used when "c" came in, "a" is still cached
+            self.assertEqual({"lambda": "a"}, self.runtime._parse_lambda("a"))
+            self.assertEqual({"lambda": "b"}, self.runtime._parse_lambda("b"))
+            self.assertEqual(4, self.session.post.call_count)
+
+    def test_failed_lambda_parse_is_not_cached(self):
+        self.session.post.side_effect = [_error_response(), _response({"lambda": "a"})]
+        with self.assertRaises(requests.HTTPError):
+            self.runtime._parse_lambda("a")
+        self.assertEqual({"lambda": "a"}, self.runtime._parse_lambda("a"))
+        self.assertEqual(2, self.session.post.call_count)
+
+    def test_parsed_model_is_reused_while_unchanged(self):
+        self.session.post.side_effect = [_response({"model": 1}), _response({"model": 2})]
+        self.assertEqual({"model": 1}, self.runtime._parse_model("model one"))
+        self.assertEqual({"model": 1}, self.runtime._parse_model("model one"))
+        self.assertEqual({"model": 2}, self.runtime._parse_model("model two"))
+        self.assertEqual(2, self.session.post.call_count)
+
+    def test_failed_model_parse_is_not_cached(self):
+        self.session.post.side_effect = [_error_response(), _response({"model": 1})]
+        with self.assertRaises(requests.HTTPError):
+            self.runtime._parse_model("model one")
+        self.assertEqual({"model": 1}, self.runtime._parse_model("model one"))
+        self.assertEqual(2, self.session.post.call_count)
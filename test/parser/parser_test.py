@@ -270,6 +270,32 @@ class ParserTest(unittest.TestCase):
                                                                                                                            reference=ColumnReferenceExpression(name='salary')),
                                                                                                      LiteralExpression(literal=IntegerLiteral(val=2))])))], p);
 
+    def test_same_line_lambdas(self):
+        table = Table("employee", {"id": int, "a": int})
+        database = Database("employee", [table])
+        lq = LegendQL.from_table(database, table).filter(lambda e: e.id == 1).filter(lambda e: e.id == 2)
+        lq2 = LegendQL.from_table(database, table); lq2.filter(lambda e: e.id > 1); lq2.filter(lambda e: e.a > 2)
+
+        self.assertEqual(["1", "2"], [str(c.expression.expression.right.expression.literal.val) for c in lq._query._clauses[1:]])
+        self.assertEqual(["id", "a"], [c.expression.expression.left.expression.reference.name for c in lq2._query._clauses[1:]])
+
+    def test_nested_lambdas(self):
+        table = Table("employee", {"id": int})
+        database = Database("employee", [table])
+        lq = LegendQL.from_table(database, table)
+        outer = lambda e: (lambda d: d.id)
+        self.assertEqual("e", Parser._get_lambda_node(outer).args.args[0].arg)
+        self.assertEqual(LambdaExpression(["d"], ColumnAliasExpression("d", ColumnReferenceExpression("id"))), Parser.parse(outer(None), [lq._query._table], ParseType.filter)[0])
+
+    def test_same_line_constant_lambdas(self):
+        # constant bodies have no column positions, so the lambdas are told apart by their compiled code
+        table = Table("employee", {"id": int})
+        database = Database("employee", [table])
+        lq = LegendQL.from_table(database, table)
+        first, second = (lambda e: 1), (lambda e: 2)
+        self.assertEqual(LambdaExpression(["e"], LiteralExpression(IntegerLiteral(1))), Parser.parse(first, [lq._query._table], ParseType.filter)[0])
+        self.assertEqual(LambdaExpression(["e"], LiteralExpression(IntegerLiteral(2))), Parser.parse(second, [lq._query._table], ParseType.filter)[0])
+
+
 if __name__ == '__main__':
     unittest.main()
-
@@ -1,61 +1,62 @@
 import unittest
+from unittest import mock
 
-from _datetime import datetime
+from _datetime import datetime, timezone, timedelta
 
-from dialect.purerelation.dialect import NonExecutablePureRuntime
+from dialect.purerelation.dialect import NonExecutablePureRuntime, PureRelationExpressionVisitor, PureRuntime
 from model.metamodel import IntegerLiteral, InnerJoinType, BinaryExpression, ColumnAliasExpression, LiteralExpression, \
     EqualsBinaryOperator, OperandExpression, FunctionExpression, \
     CountFunction, AddBinaryOperator, SubtractBinaryOperator, MultiplyBinaryOperator, DivideBinaryOperator, \
     ColumnReferenceExpression, ComputedColumnAliasExpression, MapReduceExpression, LambdaExpression, \
     VariableAliasExpression, \
     AverageFunction, OrderByExpression, AscendingOrderType, DescendingOrderType, IfExpression, \
-    GreaterThanBinaryOperator, DateLiteral, ModuloFunction, ExponentFunction
+    GreaterThanBinaryOperator, DateLiteral, ModuloFunction, ExponentFunction, StringLiteral, BooleanLiteral, \
+    NotUnaryOperator, UnaryExpression
 from model.schema import Database, Table
 from legendql.query import Query
 
 
+class EchoPureRuntime(NonExecutablePureRuntime):
+    def eval_executable(self, executable: str, clauses) -> str:
+        return executable
+
+
 class TestClauseToPureRelationDialect(unittest.TestCase):
 
-    def setUp(self):
-        pass
+    @classmethod
+    def setUpClass(cls):
+        # Query.from_table copies the table, so every test can share these
+        cls.runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
+        cls.table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
+        cls.database = Database("local::DuckDuckDatabase", [cls.table])
+        cls.table_ab = Table("table", {"id": int, "columnA": int, "columnB": int})
+        cls.database_ab = Database("local::DuckDuckDatabase", [cls.table_ab])
 
     def test_simple_select(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column")
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[column])->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_filter(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column")
                       .filter(LambdaExpression(["a"], BinaryExpression(OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), OperandExpression(LiteralExpression(IntegerLiteral(1))), EqualsBinaryOperator())))
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[column])->filter(a | $a.column==1)->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_extend(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column")
                       .extend([ComputedColumnAliasExpression("a", LambdaExpression(["a"], ColumnAliasExpression("a", ColumnReferenceExpression("column"))))])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[column])->extend(~[a:a | $a.column])->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_groupBy(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column", "column2")
                       .group_by([ColumnReferenceExpression("column"), ColumnReferenceExpression("column2")],
                    [ComputedColumnAliasExpression("count",
@@ -67,152 +68,185 @@ class TestClauseToPureRelationDialect(unittest.TestCase):
                                                       LambdaExpression(["a"], ColumnAliasExpression("a", ColumnReferenceExpression("column"))),
                                                       LambdaExpression(["a"], FunctionExpression(AverageFunction(), [VariableAliasExpression("a")]))))
                     ])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->select(~[column, column2])->groupBy(~[column, column2], ~[count:a | $a.column+$a.column2 : a | $a->count(), avg:a | $a.column : a | $a->avg()])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_simple_select_with_limit(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column")
                       .limit(10)
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[column])->limit(10)->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_simple_select_with_join(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .select("column")
                       .join("local::DuckDuckDatabase", "table2", InnerJoinType(), LambdaExpression(["a", "b"], BinaryExpression(OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), OperandExpression(ColumnAliasExpression("b", ColumnReferenceExpression("column"))), EqualsBinaryOperator())))
                       .select("column2")
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[column])->join(#>{local::DuckDuckDatabase.table2}#, JoinKind.INNER, {a, b | $a.column==$b.column})->select(~[column2])->from(local::DuckDuckRuntime)", pure_relation)
 
     def test_multiple_extends(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .extend([ComputedColumnAliasExpression("a", LambdaExpression(["a"], ColumnAliasExpression("a", ColumnReferenceExpression("column")))), ComputedColumnAliasExpression("b", LambdaExpression(["b"], ColumnAliasExpression("b", ColumnReferenceExpression("column"))))])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->extend(~[a:a | $a.column, b:b | $b.column])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_math_binary_operators(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .extend([
                                   ComputedColumnAliasExpression("add", LambdaExpression(["a"], BinaryExpression(left=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), right=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), operator=AddBinaryOperator()))),
                                   ComputedColumnAliasExpression("subtract", LambdaExpression(["a"], BinaryExpression(left=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), right=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), operator=SubtractBinaryOperator()))),
                                   ComputedColumnAliasExpression("multiply", LambdaExpression(["a"], BinaryExpression(left=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), right=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), operator=MultiplyBinaryOperator()))),
                                   ComputedColumnAliasExpression("divide", LambdaExpression(["a"], BinaryExpression(left=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), right=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("column"))), operator=DivideBinaryOperator()))),
                               ])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->extend(~[add:a | $a.column+$a.column, subtract:a | $a.column-$a.column, multiply:a | $a.column*$a.column, divide:a | $a.column/$a.column])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_single_rename(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .rename(('column', 'newColumn'))
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->rename(~column, ~newColumn)->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_multiple_renames(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .rename(('columnA', 'newColumnA'), ('columnB', 'newColumnB'))
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->rename(~columnA, ~newColumnA)->rename(~columnB, ~newColumnB)->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_offset(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .offset(5)
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->drop(5)->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_order_by(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "departmentId": int, "first": str, "last": str})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database, self.table)
                       .order_by(
                 OrderByExpression(direction=AscendingOrderType(), expression=ColumnReferenceExpression(name="columnA")),
                          OrderByExpression(direction=DescendingOrderType(), expression=ColumnReferenceExpression(name="columnB")))
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->sort([~columnA->ascending(), ~columnB->descending()])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_conditional(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "columnA": int, "columnB": int})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database_ab, self.table_ab)
                       .extend([ComputedColumnAliasExpression("conditional", LambdaExpression(["a"], IfExpression(test=BinaryExpression(left=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("columnA"))), right=OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("columnB"))), operator=GreaterThanBinaryOperator()), body=ColumnAliasExpression("a", ColumnReferenceExpression("columnA")), orelse=ColumnAliasExpression("a", ColumnReferenceExpression("columnB")))))])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->extend(~[conditional:a | if($a.columnA>$a.columnB, | $a.columnA, | $a.columnB)])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_date(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "columnA": int, "columnB": int})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database_ab, self.table_ab)
                       .extend([
                         ComputedColumnAliasExpression("dateGreater", LambdaExpression(parameters=["a"], expression=BinaryExpression(left=OperandExpression(LiteralExpression(literal=DateLiteral(datetime(2025, 4, 11)))), right=OperandExpression(LiteralExpression(literal=DateLiteral(datetime(2025, 4, 12)))), operator=GreaterThanBinaryOperator()))),
                         ComputedColumnAliasExpression("dateTimeGreater", LambdaExpression(parameters=["a"], expression=BinaryExpression(left=OperandExpression(LiteralExpression(literal=DateLiteral(datetime(2025, 4, 11, 10, 0, 0)))), right=OperandExpression(LiteralExpression(literal=DateLiteral(datetime(2025, 4, 12, 10, 0, 0)))), operator=GreaterThanBinaryOperator()))),
                       ])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->extend(~[dateGreater:a | %2025-04-11T00:00:00>%2025-04-12T00:00:00, dateTimeGreater:a | %2025-04-11T10:00:00>%2025-04-12T10:00:00])->from(local::DuckDuckRuntime)",
             pure_relation)
 
     def test_modulo_and_exponent(self):
-        runtime = NonExecutablePureRuntime("local::DuckDuckRuntime")
-        table = Table("table", {"id": int, "columnA": int, "columnB": int})
-        database = Database("local::DuckDuckDatabase", [table])
-        data_frame = (Query.from_table(database, table)
+        data_frame = (Query.from_table(self.database_ab, self.table_ab)
                       .extend([
                         ComputedColumnAliasExpression("modulo", LambdaExpression(["a"], FunctionExpression(parameters=[ColumnAliasExpression("a", ColumnReferenceExpression("column")), LiteralExpression(literal=IntegerLiteral(2))], function=ModuloFunction()))),
                         ComputedColumnAliasExpression("exponent", LambdaExpression(["a"], FunctionExpression(parameters=[ColumnAliasExpression("a", ColumnReferenceExpression("column")), LiteralExpression(literal=IntegerLiteral(2))], function=ExponentFunction())))
                       ])
-                      .bind(runtime))
+                      .bind(self.runtime))
         pure_relation = data_frame.executable_to_string()
         self.assertEqual(
             "#>{local::DuckDuckDatabase.table}#->extend(~[modulo:a | $a.column->mod(2), exponent:a | $a.column->pow(2)])->from(local::DuckDuckRuntime)",
             pure_relation)
+
+    def test_string_literal_escaping(self):
+        table = Table("table", {"id": int, "name": str})
+        database = Database("local::DuckDuckDatabase", [table])
+        data_frame = (Query.from_table(database, table)
+                      .filter(LambdaExpression(["a"], BinaryExpression(OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("name"))), OperandExpression(LiteralExpression(StringLiteral("O'Brien\\"))), EqualsBinaryOperator())))
+                      .bind(self.runtime))
+        pure_relation = data_frame.executable_to_string()
+        self.assertEqual(
+            "#>{local::DuckDuckDatabase.table}#->filter(a | $a.name=='O\\'Brien\\\\')->from(local::DuckDuckRuntime)",
+            pure_relation)
+
+    def test_literals_keep_their_own_text(self):
+        visitor = PureRelationExpressionVisitor()
+        # same instant, different offsets: each must keep its own rendering
+        self.assertEqual("%2025-01-01T10:00:00+00:00", DateLiteral(datetime(2025, 1, 1, 10, tzinfo=timezone.utc)).visit(visitor, ""))
+        self.assertEqual("%2025-01-01T05:00:00-05:00", DateLiteral(datetime(2025, 1, 1, 5, tzinfo=timezone(timedelta(hours=-5)))).visit(visitor, ""))
+        self.assertEqual("True", BooleanLiteral(True).visit(visitor, ""))
+        self.assertEqual("1", BooleanLiteral(1).visit(visitor, ""))
+
+    def test_count_and_average_ignore_extra_parameters(self):
+        visitor = PureRelationExpressionVisitor()
+        parameters = [ColumnAliasExpression("a", ColumnReferenceExpression("x")), ColumnAliasExpression("a", ColumnReferenceExpression("y"))]
+        self.assertEqual("$a.x->count()", FunctionExpression(CountFunction(), parameters).visit(visitor, ""))
+        self.assertEqual("$a.x->avg()", FunctionExpression(AverageFunction(), parameters).visit(visitor, ""))
+
+    def test_operator_subclasses_render_through_visit(self):
+        class CustomEquals(EqualsBinaryOperator):
+            pass
+
+        class CustomNot(NotUnaryOperator):
+            pass
+
+        visitor = PureRelationExpressionVisitor()
+        column = OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("id")))
+        self.assertEqual("$a.id==1", BinaryExpression(column, OperandExpression(LiteralExpression(IntegerLiteral(1))), CustomEquals()).visit(visitor, ""))
+        self.assertEqual("!$a.id", UnaryExpression(CustomNot(), column).visit(visitor, ""))
+
+    def test_join_and_order_subclasses_render_through_visit(self):
+        class CustomInner(InnerJoinType):
+            pass
+
+        class CustomAscending(AscendingOrderType):
+            pass
+
+        data_frame = (Query.from_table(self.database, self.table)
+                      .join("local::DuckDuckDatabase", "table2", CustomInner(), LambdaExpression(["a", "b"], BinaryExpression(OperandExpression(ColumnAliasExpression("a", ColumnReferenceExpression("id"))), OperandExpression(ColumnAliasExpression("b", ColumnReferenceExpression("id"))), EqualsBinaryOperator())))
+                      .order_by(OrderByExpression(direction=CustomAscending(), expression=ColumnReferenceExpression(name="id")))
+                      .bind(self.runtime))
+        pure_relation = data_frame.executable_to_string()
+        self.assertEqual("#>{local::DuckDuckDatabase.table}#->join(#>{local::DuckDuckDatabase.table2}#, JoinKind.INNER, {a, b | $a.id==$b.id})->sort([~id->ascending()])->from(local::DuckDuckRuntime)", pure_relation)
+
+    def test_bound_frame_renders_once(self):
+        runtime = EchoPureRuntime("local::DuckDuckRuntime")
+        data_frame = Query.from_table(self.database, self.table).select("id").bind(runtime)
+        with mock.patch.object(PureRuntime, "executable_to_string", autospec=True, side_effect=PureRuntime.executable_to_string) as render:
+            pure_relation = data_frame.executable_to_string()
+            self.assertEqual(pure_relation, data_frame.eval().data())
+            self.assertEqual(pure_relation, data_frame.executable_to_string())
+        self.assertEqual(1, render.call_count)
+
+    def test_bound_frame_ignores_later_clauses(self):
+        query = Query.from_table(self.database, self.table).select("id")
+        data_frame = query.bind(self.runtime)
+        query.limit(10)
+        self.assertEqual("#>{local::DuckDuckDatabase.table}#->select(~[id])->from(local::DuckDuckRuntime)", data_frame.executable_to_string())